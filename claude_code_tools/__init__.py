@@ -1,3 +1,8 @@
-from .documentation_agent import DocumentationAgent
+__all__ = ['DocumentationAgent']
 
-__all__ = ['DocumentationAgent']
\ No newline at end of file
+def __getattr__(name):
+    # Import lazily so submodules like cli_integration don't pull in the SDK up front
+    if name == 'DocumentationAgent':
+        from .documentation_agent import DocumentationAgent
+        return DocumentationAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -6,42 +6,68 @@ import os
 import sys
 import argparse
 from pathlib import Path
-from typing import List, Optional
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
-
-from .documentation_agent import DocumentationAgent
+from typing import Any, Dict, List, Optional
 
 class CLIIntegration:
     """Integration between pull_ai_nova.py and Claude Code SDK agent"""
     
+    __slots__ = ("project_root", "project_root_str", "changed_files_file", "_cached_files")
+    
     def __init__(self, project_root: str = "."):
         self.project_root = Path(project_root).resolve()
+        self.project_root_str = str(self.project_root)
         self.changed_files_file = self.project_root / ".claude_changed_files.txt"
+        self._cached_files: Optional[List[str]] = None
         
     def read_changed_files(self) -> List[str]:
         """Read the list of changed files from .claude_changed_files.txt"""
-        if not self.changed_files_file.exists():
-            return []
+        if self._cached_files is not None:
+            return self._cached_files
         
         try:
-            with open(self.changed_files_file, 'r') as f:
-                files = [line.strip() for line in f if line.strip()]
-            return files
+            content = self.changed_files_file.read_text()
+        except FileNotFoundError:
+            return []
         except Exception as e:
             print(f"Error reading changed files: {e}")
             return []
+        
+        self._cached_files = [line.strip() for line in content.splitlines() if line.strip()]
+        return self._cached_files
     
     def cleanup_changed_files(self) -> None:
         """Clean up the changed files tracking file"""
+        self._cached_files = None
         try:
             if self.changed_files_file.exists():
                 self.changed_files_file.unlink()
         except Exception as e:
             print(f"Warning: Could not clean up changed files file: {e}")
 
+async def process_files_concurrently(agent, files: List[str], project_root: str, concurrency: int = 1) -> Dict[str, Any]:
+    """Review files in separate agent sessions, running at most `concurrency` at a time"""
+    if concurrency <= 1 or len(files) <= 1:
+        return await agent.process_changed_files(files, project_root)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def process_one(file: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await agent.process_changed_files([file], project_root)
+    
+    results = await asyncio.gather(*(process_one(file) for file in files), return_exceptions=True)
+    for file, result in zip(files, results):
+        if isinstance(result, BaseException):
+            print(f"❌ {file}: {result}")
+    succeeded = [r for r in results if isinstance(r, dict) and r.get("status") == "success"]
+    
+    return {
+        "status": "success" if len(succeeded) == len(files) else "error",
+        "files_processed": len(succeeded),
+        "cost": sum(r.get("cost", 0.0) for r in results if isinstance(r, dict)),
+        "results": results
+    }
+
 async def main():
     parser = argparse.ArgumentParser(description="Claude Code SDK Documentation Agent")
     parser.add_argument("--changed-files", action="store_true", 
@@ -58,6 +84,8 @@ async def main():
                        help="Claude model to use (auto-detects best model if not specified)")
     parser.add_argument("--project-root", default=".",
                        help="Project root directory (default: current directory)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                       help="Review files in up to N parallel agent sessions (default: 1, one session for all files)")
     
     args = parser.parse_args()
     
@@ -67,6 +95,12 @@ async def main():
         parser.print_help()
         sys.exit(1)
     
+    # Deferred until the arguments are valid so --help and usage errors stay fast
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    from .documentation_agent import DocumentationAgent
+    
     # Initialize CLI integration and agent
     cli = CLIIntegration(args.project_root)
     agent = DocumentationAgent(max_turns=args.max_turns, model=args.model)
@@ -74,7 +108,7 @@ async def main():
     try:
         if args.interactive:
             # Interactive mode
-            await agent.interactive_session(str(cli.project_root))
+            await agent.interactive_session(cli.project_root_str)
         
         elif args.changed_files:
             # Process changed files from pull_ai_nova.py
@@ -87,7 +121,7 @@ async def main():
             for file in changed_files:
                 print(f"  - {file}")
             
-            result = await agent.process_changed_files(changed_files, str(cli.project_root))
+            result = await process_files_concurrently(agent, changed_files, cli.project_root_str, args.concurrency)
             
             # Clean up after successful processing
             if result.get("status") == "success":
@@ -95,11 +129,11 @@ async def main():
         
         elif args.files:
             # Process specific files
-            result = await agent.process_changed_files(args.files, str(cli.project_root))
+            result = await process_files_concurrently(agent, args.files, cli.project_root_str, args.concurrency)
         
         elif args.general_review:
             # General documentation review
-            result = await agent.general_documentation_review(str(cli.project_root))
+            result = await agent.general_documentation_review(cli.project_root_str)
         
     except KeyboardInterrupt:
         print("\n👋 Documentation agent interrupted.")
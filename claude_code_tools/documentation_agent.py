@@ -121,7 +121,7 @@ Always examine files thoroughly and improve documentation without modifying func
             return {"status": "no_files", "files_processed": 0}
 
         # Create the prompt with changed files list
-        files_text = "\n".join([f"- {file}" for file in changed_files])
+        files_text = "\n".join(map("- {}".format, changed_files))
         prompt = f"""I have the following files that were recently changed and need documentation review:
 
 {files_text}
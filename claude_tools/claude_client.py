@@ -1,15 +1,32 @@
 #!/usr/bin/env python3
+import asyncio
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 from .text_editor import TextEditor
 
+# Prefer orjson for (de)serializing the growing message history, fall back to stdlib json
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data).encode('utf-8')
+    _json_loads = json.loads
+
 # Load environment variables from .env file
 load_dotenv()
 
+# (connect, read) timeouts; reads stay generous since responses can take minutes
+REQUEST_TIMEOUT = (10, 600)
+
 class ClaudeClient:
+    __slots__ = ("api_key", "base_url", "model", "text_editor", "_session")
+    
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
         if not self.api_key:
@@ -19,14 +36,28 @@ class ClaudeClient:
         self.model = "claude-4-opus-20241022"  # Claude 4 model
         self.text_editor = TextEditor()
         
-    def _make_request(self, messages: List[Dict], tools: List[Dict]) -> Dict:
-        """Make request to Claude API"""
-        headers = {
+        # Reuse one connection across iterations instead of a new TLS handshake per request
+        self._session = requests.Session()
+        self._session.headers.update({
             "content-type": "application/json",
             "x-api-key": self.api_key,
             "anthropic-version": "2023-06-01"
-        }
+        })
+        # Small keep-alive pool so concurrent async callers don't open throwaway connections
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    
+    def close(self) -> None:
+        """Close the underlying HTTP session"""
+        self._session.close()
+    
+    def __enter__(self) -> "ClaudeClient":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
         
+    def _make_request(self, messages: List[Dict], tools: List[Dict]) -> Dict:
+        """Make request to Claude API"""
         data = {
             "model": self.model,
             "max_tokens": 4096,
@@ -34,12 +65,43 @@ class ClaudeClient:
             "messages": messages
         }
         
-        response = requests.post(self.base_url, headers=headers, json=data)
+        response = self._session.post(self.base_url, data=_json_dumps(data), timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     
     def chat_with_tools(self, initial_prompt: str, max_iterations: int = 10) -> str:
         """Chat with Claude using text editor tools"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.achat_with_tools(initial_prompt, max_iterations))
+        raise RuntimeError("chat_with_tools cannot be called from a running event loop; await achat_with_tools instead")
+    
+    async def _execute_tool(self, content: Dict) -> Optional[Dict[str, str]]:
+        """Execute a single tool_use block, returning None for unknown tools"""
+        if content["name"] == "str_replace_based_edit_tool":
+            return await self.text_editor.ahandle_command(content["input"])
+        return None
+    
+    async def _execute_tools(self, tool_uses: List[Dict]) -> List[Optional[Dict[str, str]]]:
+        """Execute tool calls concurrently, keeping calls on the same file in order"""
+        # Group by resolved path so "a.py", "./a.py" and its absolute path share one queue
+        indices_by_path: Dict[str, List[int]] = {}
+        for index, content in enumerate(tool_uses):
+            path = os.path.realpath(content["input"].get("path", ""))
+            indices_by_path.setdefault(path, []).append(index)
+        
+        results: List[Optional[Dict[str, str]]] = [None] * len(tool_uses)
+        
+        async def run_group(indices: List[int]) -> None:
+            for index in indices:
+                results[index] = await self._execute_tool(tool_uses[index])
+        
+        await asyncio.gather(*[run_group(indices) for indices in indices_by_path.values()])
+        return results
+    
+    async def achat_with_tools(self, initial_prompt: str, max_iterations: int = 10) -> str:
+        """Async variant of chat_with_tools that runs independent tool calls concurrently"""
         tools = [{
             "type": "text_editor_20250728",
             "name": "str_replace_based_edit_tool",
@@ -53,69 +115,66 @@ class ClaudeClient:
         
         conversation_log = []
         
-        for iteration in range(max_iterations):
-            print(f"Claude iteration {iteration + 1}...")
+        # Write entries as they happen so the log survives an interrupted run
+        with open("claude_conversation.log", "w", buffering=1) as log_file:
+            def log(entry: str) -> None:
+                conversation_log.append(entry)
+                log_file.write(entry + "\n")
             
-            try:
-                response = self._make_request(messages, tools)
-                
-                # Add assistant's response to messages
-                messages.append({
-                    "role": "assistant",
-                    "content": response["content"]
-                })
+            for iteration in range(max_iterations):
+                print(f"Claude iteration {iteration + 1}...")
                 
-                # Log the response
-                conversation_log.append(f"=== Claude Response {iteration + 1} ===")
-                for content in response["content"]:
-                    if content["type"] == "text":
-                        conversation_log.append(content["text"])
-                        print(content["text"])
-                
-                # Check if Claude used tools
-                tool_results = []
-                used_tools = False
-                
-                for content in response["content"]:
-                    if content["type"] == "tool_use":
-                        used_tools = True
-                        tool_name = content["name"]
-                        tool_input = content["input"]
-                        tool_id = content["id"]
+                try:
+                    response = await asyncio.to_thread(self._make_request, messages, tools)
+                    
+                    # Add assistant's response to messages
+                    messages.append({
+                        "role": "assistant",
+                        "content": response["content"]
+                    })
+                    
+                    # Log the response
+                    log(f"=== Claude Response {iteration + 1} ===")
+                    for content in response["content"]:
+                        if content["type"] == "text":
+                            log(content["text"])
+                            print(content["text"])
+                    
+                    # Check if Claude used tools
+                    tool_uses = [content for content in response["content"] if content["type"] == "tool_use"]
+                    
+                    if not tool_uses:
+                        # No tools used, conversation is complete
+                        break
+                    
+                    for content in tool_uses:
+                        print(f"Executing tool: {content['name']} with {content['input']}")
+                        log(f"Tool used: {content['name']} - {content['input']}")
+                    
+                    # Execute the tools
+                    tool_results = []
+                    for content, result in zip(tool_uses, await self._execute_tools(tool_uses)):
+                        if result is None:
+                            continue
                         
-                        print(f"Executing tool: {tool_name} with {tool_input}")
-                        conversation_log.append(f"Tool used: {tool_name} - {tool_input}")
+                        tool_results.append({
+                            "type": "tool_result",
+                            "tool_use_id": content["id"],
+                            "content": result.get("content", result.get("error", "Unknown error"))
+                        })
                         
-                        # Execute the tool
-                        if tool_name == "str_replace_based_edit_tool":
-                            result = self.text_editor.handle_command(tool_input)
-                            
-                            tool_results.append({
-                                "type": "tool_result",
-                                "tool_use_id": tool_id,
-                                "content": result.get("content", result.get("error", "Unknown error"))
-                            })
-                            
-                            conversation_log.append(f"Tool result: {result}")
-                
-                # If tools were used, continue the conversation with results
-                if used_tools:
+                        log(f"Tool result: {result}")
+                    
+                    # Continue the conversation with results
                     messages.append({
                         "role": "user",
                         "content": tool_results
                     })
-                else:
-                    # No tools used, conversation is complete
+                        
+                except Exception as e:
+                    error_msg = f"Error in iteration {iteration + 1}: {str(e)}"
+                    print(error_msg)
+                    log(error_msg)
                     break
-                    
-            except Exception as e:
-                error_msg = f"Error in iteration {iteration + 1}: {str(e)}"
-                print(error_msg)
-                conversation_log.append(error_msg)
-                break
-        
-        # Save conversation log
-        with open("claude_conversation.log", "w") as f:
-            f.write("\n".join(conversation_log))
-        
+            
         return "\n".join(conversation_log)
\ No newline at end of file
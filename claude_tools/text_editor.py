@@ -1,23 +1,61 @@
 #!/usr/bin/env python3
+import asyncio
+import hashlib
+import itertools
 import os
 import shutil
+import sys
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Set
+
+if sys.platform.startswith('linux'):
+    import fcntl
+else:
+    fcntl = None
+
+# ioctl request for a copy-on-write clone (reflink) on btrfs/xfs
+FICLONE = 0x40049409
 
 class TextEditor:
+    __slots__ = ("backup_dir", "_backed_up")
+    
     def __init__(self, backup_dir: str = ".claude_backups"):
         self.backup_dir = backup_dir
+        # Files already backed up in this session; the backup keeps the pre-session content
+        self._backed_up: Set[str] = set()
         if not os.path.exists(backup_dir):
             os.makedirs(backup_dir)
     
+    def _clone_file(self, src: str, dst: str) -> bool:
+        """Try to reflink src to dst, returning False if the filesystem can't"""
+        if fcntl is None:
+            return False
+        try:
+            with open(src, 'rb') as src_file, open(dst, 'wb') as dst_file:
+                fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError:
+            return False
+    
     def _create_backup(self, file_path: str) -> str:
         """Create a backup of the file before editing"""
         if not os.path.exists(file_path):
             return ""
         
-        backup_name = f"{os.path.basename(file_path)}.backup"
+        abs_path = os.path.realpath(file_path)
+        # Suffix a hash of the full path so same-named files in different directories don't share a backup
+        path_hash = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:10]
+        backup_name = f"{os.path.basename(file_path)}.{path_hash}.backup"
         backup_path = os.path.join(self.backup_dir, backup_name)
-        shutil.copy2(file_path, backup_path)
+        
+        if abs_path in self._backed_up:
+            return backup_path
+        
+        # Edits rewrite files in place, so a hard link would not preserve the original
+        if not self._clone_file(file_path, backup_path):
+            shutil.copy2(file_path, backup_path)
+        self._backed_up.add(abs_path)
         return backup_path
     
     def _validate_path(self, file_path: str) -> bool:
@@ -50,6 +88,11 @@ class TextEditor:
         except Exception as e:
             return {"error": f"Command failed: {str(e)}"}
     
+    async def ahandle_command(self, command_data: Dict[str, Any]) -> Dict[str, str]:
+        """Handle a text editor command without blocking the event loop"""
+        # One thread hop per command; each handler does its backup/read/write in a single sync call
+        return await asyncio.to_thread(self.handle_command, command_data)
+    
     def _handle_view(self, file_path: str, view_range: Optional[list] = None) -> Dict[str, str]:
         """Handle view command"""
         try:
@@ -62,17 +105,17 @@ class TextEditor:
             if not os.path.exists(file_path):
                 return {"error": f"File not found: {file_path}"}
             
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
+            start_line = 0
+            end_line = None
             if view_range:
                 start_line = max(1, view_range[0]) - 1  # Convert to 0-indexed
-                end_line = len(lines) if view_range[1] == -1 else min(len(lines), view_range[1])
-                lines = lines[start_line:end_line]
+                end_line = None if view_range[1] == -1 else max(start_line, view_range[1])
             
-            # Add line numbers
-            numbered_lines = [f"{i+1}: {line.rstrip()}" for i, line in enumerate(lines)]
-            content = "\n".join(numbered_lines)
+            # Only read up to the requested window, numbering lines (relative to the
+            # start of the file) as they stream in rather than building intermediate lists
+            with open(file_path, 'r', encoding='utf-8', buffering=1 << 20) as f:
+                lines = itertools.islice(f, start_line, end_line)
+                content = "\n".join(f"{i}: {line.rstrip()}" for i, line in enumerate(lines, start_line + 1))
             
             return {"content": content}
             
@@ -85,20 +128,21 @@ class TextEditor:
             if not os.path.exists(file_path):
                 return {"error": f"File not found: {file_path}"}
             
-            # Create backup
-            self._create_backup(file_path)
-            
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
             
-            if old_str not in content:
+            pos = content.find(old_str)
+            if pos < 0:
                 return {"error": "Text to replace not found"}
             
-            # Check for multiple matches
-            if content.count(old_str) > 1:
+            # Check for multiple matches (only count them all on the error path)
+            if content.find(old_str, pos + len(old_str)) >= 0:
                 return {"error": f"Multiple matches found ({content.count(old_str)}). Please provide more specific text."}
             
-            new_content = content.replace(old_str, new_str)
+            # Create backup only once the replacement is known to succeed
+            self._create_backup(file_path)
+            
+            new_content = content[:pos] + new_str + content[pos + len(old_str):]
             
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(new_content)
@@ -4,26 +4,152 @@ Documentation Agent - Claude Code SDK Agent for automated documentation improvem
 """
 
 import asyncio
+import contextlib
+import io
+import logging
 import os
+import sys
+import time
+from functools import lru_cache
 from typing import List, Optional, Dict, Any
-from datetime import datetime
 from dotenv import load_dotenv
-from claude_code_sdk import ClaudeSDKClient, ClaudeCodeOptions
+from claude_code_sdk import (
+    AssistantMessage,
+    ClaudeCodeOptions,
+    ClaudeSDKClient,
+    ResultMessage,
+    TextBlock,
+    ToolUseBlock,
+)
+from config import load_auth_config
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger('doc_agent')
+
+# Time budgets for sending the query and for one whole agent run
+QUERY_TIMEOUT_SECONDS = 30
+RUN_TIMEOUT_SECONDS = 300
+
+# Default models: Claude 3.5 Sonnet inference profiles for Bedrock, or the direct API model
+_BEDROCK_MODEL_BY_REGION = {'eu-central-1': "eu.anthropic.claude-3-5-sonnet-20240620-v1:0"}
+_BEDROCK_DEFAULT = "us.anthropic.claude-3-5-sonnet-20240620-v1:0"
+_API_DEFAULT = "claude-3-5-sonnet-20241022"
+
+# Tools the agent may and may not use, shared by every run
+_ALLOWED_TOOLS = ("Read", "Write", "Edit", "Glob", "Grep")
+_DISALLOWED_TOOLS = ("Bash", "WebSearch")
+
+@lru_cache(maxsize=8)
+def _read_prompt_cached(path: str, mtime_ns: int, size: int) -> str:
+    """Read a prompt file once per (path, mtime, size) and share it across agents"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
+
+def _read_prompt(path: str) -> str:
+    """Read a prompt file, re-reading only when it has changed on disk"""
+    st = os.stat(path)
+    return _read_prompt_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+@lru_cache(maxsize=1)
+def _bedrock_botocore_config():
+    """Shared botocore config with pooled keep-alive connections and adaptive retries"""
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=int(os.getenv('BEDROCK_MAX_POOL', '50')),
+        tcp_keepalive=True,
+        retries={'mode': 'adaptive', 'max_attempts': 5},
+        connect_timeout=5,
+        read_timeout=60
+    )
+
+@lru_cache(maxsize=None)
+def _get_session(profile: Optional[str], region: str):
+    """Create one boto3 session per profile/region and reuse it across agents"""
+    import boto3
+    return boto3.Session(profile_name=profile, region_name=region)
+
+@lru_cache(maxsize=None)
+def _get_aws_client(service: str, profile: Optional[str], region: str):
+    """Create one client per service/profile/region and reuse it across agents"""
+    return _get_session(profile, region).client(service, config=_bedrock_botocore_config())
+
+class _FlushBuffer:
+    """Batches streamed text so stdout is flushed per chunk of output, not per block"""
+
+    def __init__(self, max_chars: int = 16384, max_delay: float = 0.05):
+        self.max_chars = max_chars
+        self.max_delay = max_delay
+        self._parts: List[str] = []
+        self._size = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.max_chars or time.monotonic() - self._last_flush > self.max_delay:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write out pending text; call before printing anything else"""
+        if self._parts:
+            sys.stdout.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        sys.stdout.flush()
+        self._last_flush = time.monotonic()
+
 class DocumentationAgent:
     """Claude Code SDK agent for automated documentation improvements"""
     
-    def __init__(self, max_turns: int = 5, model: str = None, system_prompt_file: str = "system_prompt.txt"):
+    __slots__ = ("max_turns", "project_root", "_client", "system_prompt_file", "verify_bedrock",
+                 "boto3_session", "auth", "model", "system_prompt")
+    
+    def __init__(self, max_turns: int = 5, model: str = None, system_prompt_file: str = "system_prompt.txt",
+                 verify_bedrock: bool = False, boto3_session=None, project_root: str = "."):
         self.max_turns = max_turns
+        self.project_root = project_root
+        # Long-lived SDK client, set while the agent is used as an async context manager
+        self._client = None
         self.system_prompt_file = system_prompt_file
+        # Checking model access is an extra Bedrock API call, so it's opt-in
+        self.verify_bedrock = verify_bedrock
+        self.boto3_session = boto3_session
+        self.auth = load_auth_config()
         # Use simple, reliable model for Bedrock or default for API
         self.model = model or self._get_default_model()
         self.system_prompt = self._load_system_prompt()
         self._check_configuration()
 
+    @classmethod
+    async def create(cls, **kwargs) -> "DocumentationAgent":
+        """Construct an agent off the event loop, for use from async code"""
+        # Prompt file reads and the AWS probe are blocking I/O
+        return await asyncio.to_thread(cls, **kwargs)
+
+    async def __aenter__(self):
+        """Connect one SDK client that runs in project_root will reuse"""
+        self._client = ClaudeSDKClient(options=self._make_options(self.max_turns, self.project_root))
+        await self._client.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        client, self._client = self._client, None
+        await client.disconnect()
+
+    def _make_options(self, max_turns: int, cwd: str) -> ClaudeCodeOptions:
+        """Build the SDK options shared by every run"""
+        return ClaudeCodeOptions(
+            system_prompt=self.system_prompt,
+            max_turns=max_turns,
+            model=self.model,
+            cwd=cwd,
+            allowed_tools=list(_ALLOWED_TOOLS),
+            disallowed_tools=list(_DISALLOWED_TOOLS),
+            permission_mode="acceptEdits"
+        )
+
     def _load_system_prompt(self) -> str:
         """Load system prompt from file"""
         try:
@@ -31,20 +157,22 @@ class DocumentationAgent:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             prompt_path = os.path.join(script_dir, self.system_prompt_file)
             
-            if os.path.exists(prompt_path):
-                with open(prompt_path, 'r') as f:
-                    return f.read().strip()
+            try:
+                return _read_prompt(prompt_path)
+            except FileNotFoundError:
+                pass
             
             # Try current working directory
-            if os.path.exists(self.system_prompt_file):
-                with open(self.system_prompt_file, 'r') as f:
-                    return f.read().strip()
+            try:
+                return _read_prompt(self.system_prompt_file)
+            except FileNotFoundError:
+                pass
             
-            print(f"⚠️  System prompt file '{self.system_prompt_file}' not found, using default")
+            logger.warning("⚠️  System prompt file '%s' not found, using default", self.system_prompt_file)
             return self._get_default_system_prompt()
             
         except Exception as e:
-            print(f"⚠️  Error loading system prompt: {e}")
+            logger.warning("⚠️  Error loading system prompt: %s", e)
             return self._get_default_system_prompt()
 
     def _get_default_system_prompt(self) -> str:
@@ -53,105 +181,103 @@ class DocumentationAgent:
 
     def _get_default_model(self) -> str:
         """Get default model based on authentication method"""
-        use_bedrock = os.getenv('CLAUDE_CODE_USE_BEDROCK', '').lower() in ['1', 'true', 'yes']
-        
-        if use_bedrock:
-            # Use Claude 3.5 Sonnet inference profile for Bedrock
-            region = os.getenv('AWS_REGION', 'us-east-1')
-            if region == 'eu-central-1':
-                return "eu.anthropic.claude-3-5-sonnet-20240620-v1:0"
-            else:
-                return "us.anthropic.claude-3-5-sonnet-20240620-v1:0"
-        else:
-            # Default for direct Anthropic API
-            return "claude-3-5-sonnet-20241022"
+        if self.auth.use_bedrock:
+            return _BEDROCK_MODEL_BY_REGION.get(self.auth.region, _BEDROCK_DEFAULT)
+        return _API_DEFAULT
 
     def _check_configuration(self):
         """Check and display current authentication configuration"""
-        use_bedrock = os.getenv('CLAUDE_CODE_USE_BEDROCK', '').lower() in ['1', 'true', 'yes']
-        anthropic_key = os.getenv('ANTHROPIC_API_KEY')
+        auth = self.auth
         
-        if use_bedrock:
-            print("🔧 Using Amazon Bedrock for Claude Code SDK")
+        if auth.use_bedrock:
+            logger.info("🔧 Using Amazon Bedrock for Claude Code SDK")
             # Check AWS configuration
-            aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
-            aws_profile = os.getenv('AWS_PROFILE', 'default')
-            aws_region = os.getenv('AWS_REGION', os.getenv('AWS_DEFAULT_REGION', 'us-east-1'))
-            
-            if aws_access_key:
-                print(f"   AWS Region: {aws_region}")
-                print("   AWS credentials: Environment variables")
+            if auth.access_key:
+                logger.info("   AWS Region: %s", auth.region)
+                logger.info("   AWS credentials: Environment variables")
             else:
-                print(f"   AWS credentials: Profile '{aws_profile}' (AWS CLI)")
-                print(f"   AWS Region: {aws_region}")
+                logger.info("   AWS credentials: Profile '%s' (AWS CLI)", auth.profile or 'default')
+                logger.info("   AWS Region: %s", auth.region)
             
-            # Test AWS connection
-            self._test_aws_connection()
-        elif anthropic_key:
-            print("🔧 Using Anthropic API directly")
-            print(f"   API Key: {anthropic_key[:20]}...")
+            # Test AWS connection (boto3 import + STS call) unless disabled for production
+            if not auth.skip_bedrock_probe:
+                self._test_aws_connection()
+        elif auth.anthropic_key:
+            logger.info("🔧 Using Anthropic API directly")
+            logger.info("   API Key: %s...", auth.anthropic_key[:20])
         else:
-            print("⚠️  No authentication configured!")
-            print("   Set CLAUDE_CODE_USE_BEDROCK=1 for Bedrock, or ANTHROPIC_API_KEY for direct API")
+            logger.warning("⚠️  No authentication configured!")
+            logger.warning("   Set CLAUDE_CODE_USE_BEDROCK=1 for Bedrock, or ANTHROPIC_API_KEY for direct API")
+
+    def diagnose(self):
+        """Run the full AWS connection and Bedrock model access check"""
+        self.verify_bedrock = True
+        self._test_aws_connection()
+
+    def _aws_client(self, service: str, profile: Optional[str], region: str):
+        """Get an AWS client from the injected session or the shared cache"""
+        if self.boto3_session is not None:
+            return self.boto3_session.client(service, region_name=region, config=_bedrock_botocore_config())
+        return _get_aws_client(service, profile, region)
 
     def _test_aws_connection(self):
-        """Test AWS connection and Bedrock access"""
+        """Test AWS connection and, if requested, Bedrock model access"""
         try:
-            import boto3
             from botocore.exceptions import NoCredentialsError, ClientError
             
-            print("   Testing AWS connection...")
+            logger.info("   Testing AWS connection...")
+            
+            profile = self.auth.profile
+            region = self.auth.region
             
             # Test basic AWS connection
-            session = boto3.Session(profile_name=os.getenv('AWS_PROFILE'))
-            sts = session.client('sts')
+            sts = self._aws_client('sts', profile, region)
             identity = sts.get_caller_identity()
-            print(f"   ✅ AWS Identity: {identity.get('Arn', 'Unknown')}")
+            logger.info("   ✅ AWS Identity: %s", identity.get('Arn', 'Unknown'))
             
-            # Test Bedrock access
-            region = os.getenv('AWS_REGION', os.getenv('AWS_DEFAULT_REGION', 'us-east-1'))
-            bedrock = session.client('bedrock', region_name=region)
-            models = bedrock.list_foundation_models()
-            claude_models = [m for m in models['modelSummaries'] if 'claude' in m['modelId'].lower()]
+            # Test Bedrock access to the configured model only
+            if self.verify_bedrock:
+                bedrock = self._aws_client('bedrock', profile, region)
+                # Inference profile IDs carry a region prefix (us./eu.) on top of the model ID
+                model_id = self.model.split('.', 1)[1] if self.model.startswith(('us.', 'eu.')) else self.model
+                bedrock.get_foundation_model(modelIdentifier=model_id)
+                logger.info("   ✅ Bedrock access: %s is available", model_id)
             
-            if claude_models:
-                print(f"   ✅ Bedrock access: Found {len(claude_models)} Claude models")
-                print(f"   🤖 Using model: {self.model}")
-            else:
-                print("   ⚠️  No Claude models found in Bedrock")
-                print("      Make sure Claude models are enabled in the Bedrock console")
+            logger.info("   🤖 Using model: %s", self.model)
                 
         except NoCredentialsError:
-            print("   ❌ No AWS credentials found")
-            print("      Run 'aws configure' or set AWS environment variables")
+            logger.error("   ❌ No AWS credentials found")
+            logger.error("      Run 'aws configure' or set AWS environment variables")
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', 'Unknown')
-            print(f"   ❌ AWS Error ({error_code}): {e}")
+            logger.error("   ❌ AWS Error (%s): %s", error_code, e)
             if error_code == 'AccessDeniedException':
-                print("      Check your AWS permissions for Bedrock access")
+                logger.error("      Check your AWS permissions for Bedrock access")
+            elif error_code in ('ResourceNotFoundException', 'ValidationException'):
+                logger.error("      Make sure Claude models are enabled in the Bedrock console")
         except Exception as e:
-            print(f"   ❌ Connection test failed: {e}")
+            logger.error("   ❌ Connection test failed: %s", e)
 
     async def process_files(self, files: List[str], project_root: str = ".") -> Dict[str, Any]:
         """Process a list of files for documentation improvements"""
         if not files:
-            print("No files to process.")
+            logger.info("No files to process.")
             return {"status": "no_files", "files_processed": 0}
 
         # Create the prompt with file list
-        files_text = "\n".join([f"- {file}" for file in files])
+        files_text = "\n".join(map("- {}".format, files))
         prompt = f"""I have the following files that need documentation review:
 
 {files_text}
 
-Please examine each file and improve its documentation. Focus on:
+Start by reading all of these files in a single turn, issuing the Read tool calls in parallel rather than one file per turn. Then improve the documentation of each file. Focus on:
 1. Adding missing docstrings to functions and classes
 2. Adding type hints where they're missing
 3. Adding comments for complex or non-obvious code sections
 4. Creating #TODO comments for any code issues you identify
 5. Ensuring documentation follows Python/JavaScript/TypeScript conventions
 
-Start by examining the first file and work through each one systematically."""
+The files are independent, so batch the edits for several files into the same turn as parallel tool calls where possible."""
 
         return await self._run_agent(prompt, project_root)
 
@@ -173,128 +299,130 @@ Focus on the most important files first (main modules, core functionality)."""
         """Run the Claude agent with the given prompt"""
         results = {
             "status": "success", 
-            "messages": [],
+            "messages": "",
+            "tool_uses": [],
             "cost": 0.0,
             "duration_ms": 0,
             "session_id": None
         }
 
-        start_time = datetime.now()
+        start_time = time.monotonic()
         
         try:
-            print("🤖 Initializing Claude Code SDK client...")
+            logger.info("🤖 Initializing Claude Code SDK client...")
             
-            # Create client with timeout
-            options = ClaudeCodeOptions(
-                system_prompt=self.system_prompt,
-                max_turns=self.max_turns,
-                model=self.model,
-                cwd=project_root,
-                allowed_tools=["Read", "Write", "Edit", "Glob", "Grep"],
-                disallowed_tools=["Bash", "WebSearch"],
-                permission_mode="acceptEdits"
-            )
+            # Reuse the connected client when it was opened for the same directory
+            if self._client is not None and project_root == self.project_root:
+                client_cm = contextlib.nullcontext(self._client)
+            else:
+                client_cm = ClaudeSDKClient(options=self._make_options(self.max_turns, project_root))
             
-            print(f"📋 Configuration:")
-            print(f"   Model: {self.model}")
-            print(f"   Max turns: {self.max_turns}")
-            print(f"   Working directory: {project_root}")
-            print(f"   Tools: Read, Write, Edit, Glob, Grep")
-            print(f"   Bedrock mode: {os.getenv('CLAUDE_CODE_USE_BEDROCK', 'false')}")
+            logger.info("📋 Configuration:")
+            logger.info("   Model: %s", self.model)
+            logger.info("   Max turns: %s", self.max_turns)
+            logger.info("   Working directory: %s", project_root)
+            logger.info("   Tools: %s", ", ".join(_ALLOWED_TOOLS))
+            logger.info("   Bedrock mode: %s", self.auth.use_bedrock)
             
-            async with ClaudeSDKClient(options=options) as client:
-                print("✅ Client connected successfully")
-                print("🚀 Sending query to Claude...")
-                print("=" * 50)
+            async with client_cm as client:
+                logger.info("✅ Client connected successfully")
+                logger.info("🚀 Sending query to Claude...")
+                logger.info("=" * 50)
                 
                 # Send query with timeout
-                query_task = asyncio.create_task(client.query(prompt))
-                await asyncio.wait_for(query_task, timeout=30.0)
-                print("✅ Query sent successfully")
+                async with asyncio.timeout(QUERY_TIMEOUT_SECONDS):
+                    await client.query(prompt)
+                logger.info("✅ Query sent successfully")
 
                 # Process response with timeout and better error handling
-                message_text = []
+                # Streamed text goes into one buffer; tool tags are few and kept apart
+                message_buf = io.StringIO()
+                tool_uses = []
                 response_count = 0
+                output = _FlushBuffer()
                 
                 try:
-                    print("📡 Receiving response...")
+                    logger.info("📡 Receiving response...")
                     async for message in client.receive_response():
                         response_count += 1
-                        print(f"📨 Processing message {response_count}...")
+                        logger.info("📨 Processing message %d...", response_count)
                         
-                        if hasattr(message, 'content'):
+                        # Dispatch on the SDK's concrete types instead of probing attributes
+                        message_type = type(message)
+                        if message_type is AssistantMessage:
                             for block in message.content:
-                                if hasattr(block, 'type'):
-                                    if block.type == 'tool_use':
-                                        tool_info = f"[Using tool: {block.name}]"
-                                        print(f"\n🔧 {tool_info}")
-                                        message_text.append(tool_info)
-                                        if hasattr(block, 'input'):
-                                            print(f"   Input: {str(block.input)[:100]}...")
-                                if hasattr(block, 'text'):
-                                    print(block.text, end='', flush=True)
-                                    message_text.append(block.text)
-
-                        # Check for different message types
-                        message_type = type(message).__name__
-                        print(f"\n📋 Message type: {message_type}")
+                                block_type = type(block)
+                                if block_type is TextBlock:
+                                    output.write(block.text)
+                                    message_buf.write(block.text)
+                                elif block_type is ToolUseBlock:
+                                    tool_info = f"[Using tool: {block.name}]"
+                                    output.flush()
+                                    logger.info("\n🔧 %s", tool_info)
+                                    tool_uses.append(tool_info)
+                                    logger.info("   Input: %.100s...", block.input)
+
+                        output.flush()
+                        logger.info("\n📋 Message type: %s", message_type.__name__)
                         
-                        if message_type == "ResultMessage":
-                            print("✅ Received final result message")
+                        if message_type is ResultMessage:
+                            logger.info("✅ Received final result message")
                             results.update({
                                 "cost": getattr(message, 'total_cost_usd', 0.0),
                                 "duration_ms": getattr(message, 'duration_ms', 0),
                                 "session_id": getattr(message, 'session_id', None),
-                                "messages": message_text
+                                "messages": message_buf.getvalue(),
+                                "tool_uses": tool_uses
                             })
                             break
-                        elif message_type == "ErrorMessage":
+                        elif message_type.__name__ == "ErrorMessage":
                             error_msg = getattr(message, 'error', 'Unknown error')
-                            print(f"❌ Received error message: {error_msg}")
+                            logger.error("❌ Received error message: %s", error_msg)
                             raise Exception(f"Claude returned error: {error_msg}")
                         
                         # Safety timeout per message
-                        elapsed = (datetime.now() - start_time).total_seconds()
-                        if elapsed > 300:  # 5 minute total timeout
-                            print(f"⏰ Timeout after {elapsed:.1f}s - stopping")
+                        elapsed = time.monotonic() - start_time
+                        if elapsed > RUN_TIMEOUT_SECONDS:
+                            logger.warning("⏰ Timeout after %.1fs - stopping", elapsed)
                             break
                 
-                except asyncio.TimeoutError:
-                    print("⏰ Response timeout - the agent may still be processing")
+                except TimeoutError:
+                    output.flush()
+                    logger.warning("⏰ Response timeout - the agent may still be processing")
                     results.update({"status": "timeout", "error": "Response timeout"})
                     return results
                 
-                elapsed = (datetime.now() - start_time).total_seconds()
-                print(f"\n" + "=" * 50)
-                print(f"✅ Documentation agent completed!")
-                print(f"💰 Cost: ${results['cost']:.4f}")
-                print(f"⏱️  Duration: {elapsed:.1f}s")
-                print(f"📨 Messages processed: {response_count}")
+                elapsed = time.monotonic() - start_time
+                logger.info("\n%s", "=" * 50)
+                logger.info("✅ Documentation agent completed!")
+                logger.info("💰 Cost: $%.4f", results['cost'])
+                logger.info("⏱️  Duration: %.1fs", elapsed)
+                logger.info("📨 Messages processed: %d", response_count)
                 
                 return results
 
-        except asyncio.TimeoutError:
-            print("⏰ Timeout during query sending")
+        except TimeoutError:
+            logger.warning("⏰ Timeout during query sending")
             results.update({
                 "status": "timeout",
-                "error": "Query timeout after 30 seconds"
+                "error": f"Query timeout after {QUERY_TIMEOUT_SECONDS} seconds"
             })
             return results
         except Exception as e:
-            elapsed = (datetime.now() - start_time).total_seconds()
-            print(f"❌ Agent failed after {elapsed:.1f}s: {str(e)}")
-            print(f"🔍 Error type: {type(e).__name__}")
+            elapsed = time.monotonic() - start_time
+            logger.error("❌ Agent failed after %.1fs: %s", elapsed, e)
+            logger.error("🔍 Error type: %s", type(e).__name__)
             
             # More detailed error information
             if "bedrock" in str(e).lower():
-                print("💡 This appears to be a Bedrock-related error")
-                print("   Check: AWS credentials, region, model access")
+                logger.error("💡 This appears to be a Bedrock-related error")
+                logger.error("   Check: AWS credentials, region, model access")
             elif "permission" in str(e).lower():
-                print("💡 This appears to be a permission error")
-                print("   Check: AWS IAM permissions for Bedrock")
+                logger.error("💡 This appears to be a permission error")
+                logger.error("   Check: AWS IAM permissions for Bedrock")
             elif "model" in str(e).lower():
-                print("💡 This appears to be a model-related error")  
-                print("   Check: Model availability and access in Bedrock console")
+                logger.error("💡 This appears to be a model-related error")
+                logger.error("   Check: Model availability and access in Bedrock console")
             
             results.update({
                 "status": "error",
@@ -309,17 +437,7 @@ Focus on the most important files first (main modules, core functionality)."""
         print("Type 'exit' or 'quit' to end the session")
         print("=" * 50)
 
-        async with ClaudeSDKClient(
-            options=ClaudeCodeOptions(
-                system_prompt=self.system_prompt,
-                max_turns=10,
-                model=self.model,
-                cwd=project_root,
-                allowed_tools=["Read", "Write", "Edit", "Glob", "Grep"],
-                disallowed_tools=["Bash", "WebSearch"],
-                permission_mode="acceptEdits"
-            )
-        ) as client:
+        async with ClaudeSDKClient(options=self._make_options(10, project_root)) as client:
             
             while True:
                 try:
@@ -334,18 +452,25 @@ Focus on the most important files first (main modules, core functionality)."""
                     
                     await client.query(user_input)
                     
-                    async for message in client.receive_response():
-                        if hasattr(message, 'content'):
-                            for block in message.content:
-                                if hasattr(block, 'type'):
-                                    if block.type == 'tool_use':
+                    output = _FlushBuffer()
+                    try:
+                        async for message in client.receive_response():
+                            message_type = type(message)
+                            if message_type is AssistantMessage:
+                                for block in message.content:
+                                    block_type = type(block)
+                                    if block_type is TextBlock:
+                                        output.write(block.text)
+                                    elif block_type is ToolUseBlock:
+                                        output.flush()
                                         print(f"\n[Using tool: {block.name}]")
-                                if hasattr(block, 'text'):
-                                    print(block.text, end='', flush=True)
-                        
-                        if type(message).__name__ == "ResultMessage":
-                            print(f"\n💰 Cost: ${message.total_cost_usd:.4f}")
-                            break
+                            
+                            if message_type is ResultMessage:
+                                output.flush()
+                                print(f"\n💰 Cost: ${message.total_cost_usd:.4f}")
+                                break
+                    finally:
+                        output.flush()
                 
                 except KeyboardInterrupt:
                     print("\n👋 Session interrupted.")
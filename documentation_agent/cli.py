@@ -5,16 +5,40 @@ CLI interface for the Documentation Agent
 
 import asyncio
 import argparse
+import logging
+import os
 import sys
 from pathlib import Path
 from typing import List
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (and not available on Windows); use the default event loop
+    uvloop = None
+
 # Load environment variables
 load_dotenv()
 
 from agent import DocumentationAgent
 
+def run(coro):
+    """Run a coroutine on uvloop if it is installed, otherwise on the default loop"""
+    if uvloop is None:
+        return asyncio.run(coro)
+    with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+        return runner.run(coro)
+
+def configure_logging():
+    """Print agent status lines to stdout at the level set by DOC_AGENT_LOG (default: info)"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger('doc_agent')
+    logger.addHandler(handler)
+    logger.setLevel(getattr(logging, os.getenv('DOC_AGENT_LOG', 'info').upper(), logging.INFO))
+    logger.propagate = False
+
 def main():
     parser = argparse.ArgumentParser(description="Claude Code SDK Documentation Agent")
     parser.add_argument("--files", nargs="+", 
@@ -31,37 +55,51 @@ def main():
                        help="Path to system prompt file")
     parser.add_argument("--project-root", default=".",
                        help="Project root directory (default: current directory)")
+    parser.add_argument("--verify-bedrock", action="store_true",
+                       help="Check that the model is available in Bedrock at startup")
+    parser.add_argument("--diagnose", action="store_true",
+                       help="Check AWS credentials and Bedrock model access, then exit")
     
     args = parser.parse_args()
     
     # Validate that at least one mode is selected
-    if not any([args.general_review, args.interactive, args.files]):
-        print("Error: You must specify one of --general-review, --interactive, or --files")
+    if not any([args.general_review, args.interactive, args.files, args.diagnose]):
+        print("Error: You must specify one of --general-review, --interactive, --files, or --diagnose")
         parser.print_help()
         sys.exit(1)
     
+    configure_logging()
+    
+    if args.diagnose:
+        # Constructing the agent runs the full probe; run it explicitly if SKIP_BEDROCK_PROBE is set
+        agent = DocumentationAgent(model=args.model, system_prompt_file=args.system_prompt, verify_bedrock=True)
+        if agent.auth.use_bedrock and agent.auth.skip_bedrock_probe:
+            agent.diagnose()
+        sys.exit(0)
+    
     # Initialize agent
     agent = DocumentationAgent(
         max_turns=args.max_turns, 
         model=args.model,
-        system_prompt_file=args.system_prompt
+        system_prompt_file=args.system_prompt,
+        verify_bedrock=args.verify_bedrock
     )
     
     try:
         if args.interactive:
             # Interactive mode
-            asyncio.run(agent.interactive_session(args.project_root))
+            run(agent.interactive_session(args.project_root))
         
         elif args.files:
             # Process specific files
-            result = asyncio.run(agent.process_files(args.files, args.project_root))
+            result = run(agent.process_files(args.files, args.project_root))
             print(f"\nResult: {result['status']}")
             if result.get('cost'):
                 print(f"Cost: ${result['cost']:.4f}")
         
         elif args.general_review:
             # General documentation review
-            result = asyncio.run(agent.general_review(args.project_root))
+            result = run(agent.general_review(args.project_root))
             print(f"\nResult: {result['status']}")
             if result.get('cost'):
                 print(f"Cost: ${result['cost']:.4f}")
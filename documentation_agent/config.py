@@ -4,12 +4,36 @@ Configuration utilities for the Documentation Agent
 """
 
 import os
-from typing import Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+@dataclass(frozen=True, slots=True)
+class AuthConfig:
+    """Authentication settings parsed once from the environment"""
+    use_bedrock: bool
+    region: str
+    profile: Optional[str]
+    access_key: Optional[str]
+    anthropic_key: Optional[str]
+    skip_bedrock_probe: bool
+
+@lru_cache(maxsize=1)
+def load_auth_config() -> AuthConfig:
+    """Read the authentication environment variables once per process"""
+    return AuthConfig(
+        use_bedrock=os.getenv('CLAUDE_CODE_USE_BEDROCK', '').lower() in ['1', 'true', 'yes'],
+        region=os.getenv('AWS_REGION', os.getenv('AWS_DEFAULT_REGION', 'us-east-1')),
+        profile=os.getenv('AWS_PROFILE'),
+        access_key=os.getenv('AWS_ACCESS_KEY_ID'),
+        anthropic_key=os.getenv('ANTHROPIC_API_KEY'),
+        skip_bedrock_probe=os.getenv('SKIP_BEDROCK_PROBE', '').lower() in ['1', 'true', 'yes']
+    )
+
 def get_bedrock_config() -> Dict[str, Any]:
     """Get recommended Bedrock configuration"""
     return {
@@ -19,6 +43,8 @@ def get_bedrock_config() -> Dict[str, Any]:
         'DISABLE_PROMPT_CACHING': '1',
         'CLAUDE_CODE_MAX_OUTPUT_TOKENS': '4096',
         'MAX_THINKING_TOKENS': '0',  # Disable thinking for compatibility
+        'BEDROCK_MAX_POOL': '50',    # Max pooled connections per AWS client
+        'SKIP_BEDROCK_PROBE': '1',   # Skip the AWS check at startup; use cli.py --diagnose instead
     }
 
 def get_anthropic_api_config() -> Dict[str, Any]:
@@ -56,9 +82,9 @@ def print_env_setup():
 
 def validate_config():
     """Validate current configuration"""
-    use_bedrock = os.getenv('CLAUDE_CODE_USE_BEDROCK', '').lower() in ['1', 'true', 'yes']
+    auth = load_auth_config()
     
-    if use_bedrock:
+    if auth.use_bedrock:
         print("✅ Bedrock mode enabled")
         
         # Check required Bedrock environment variables
@@ -74,10 +100,7 @@ def validate_config():
             return False
         
         # Check AWS profile or credentials
-        aws_profile = os.getenv('AWS_PROFILE')
-        aws_access_key = os.getenv('AWS_ACCESS_KEY_ID')
-        
-        if not aws_profile and not aws_access_key:
+        if not auth.profile and not auth.access_key:
             print("⚠️  No AWS_PROFILE or AWS_ACCESS_KEY_ID found")
             print("   Run 'aws configure' or set AWS environment variables")
         
@@ -87,8 +110,7 @@ def validate_config():
         print("✅ Direct API mode enabled")
         
         # Check Anthropic API key
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
+        if not auth.anthropic_key:
             print("❌ Missing ANTHROPIC_API_KEY")
             return False
         
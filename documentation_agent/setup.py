@@ -4,6 +4,7 @@ Setup script for Documentation Agent
 """
 
 import os
+import shutil
 import subprocess
 import sys
 from pathlib import Path
@@ -20,7 +21,14 @@ def install_python_deps():
     """Install Python dependencies"""
     try:
         print("📦 Installing Python dependencies...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        env = {**os.environ, 'PIP_DISABLE_PIP_VERSION_CHECK': '1'}
+        if shutil.which("uv"):
+            # uv resolves and downloads in parallel; target this interpreter explicitly
+            cmd = ["uv", "pip", "install", "--python", sys.executable, "-r", "requirements.txt"]
+        else:
+            cmd = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check",
+                   "--no-input", "--progress-bar", "off", "-r", "requirements.txt"]
+        subprocess.check_call(cmd, env=env)
         print("✅ Python dependencies installed")
         return True
     except subprocess.CalledProcessError:
@@ -31,17 +31,16 @@ def process_data(data: List[float]) -> List[float]:
     Returns:
         List[float]: A new list containing doubled positive values from the input.
     """
-    result = []
-    for item in data:
-        if item > 0:
-            result.append(item * 2)
-    return result
+    return [item * 2 for item in data if item > 0]
 
 class DataProcessor:
     """
     A class for processing data items and tracking the number of processed items.
     """
 
+    # Converter per exact item type; bool is listed since type(True) is bool, not int
+    _DISPATCH = {str: str.upper, int: str, float: str, bool: str}
+
     def __init__(self, name: str):
         """
         Initialize a DataProcessor instance.
@@ -55,7 +54,8 @@ class DataProcessor:
     def process_item(self, item: Union[str, int, float]) -> str:
         """
         Process a single item by converting it to uppercase if it's a string,
-        or converting it to a string if it's a number.
+        or converting it to a string if it's a number. Dispatch is on the exact
+        type, so str subclasses are converted with str() rather than upper-cased.
 
         Args:
             item (Union[str, int, float]): The item to process.
@@ -64,6 +64,6 @@ class DataProcessor:
             str: The processed item as a string.
         """
         self.processed_count += 1
-        return item.upper() if isinstance(item, str) else str(item)
+        return DataProcessor._DISPATCH.get(type(item), str)(item)
 
 # TODO: Consider adding error handling for invalid input types in process_item method
\ No newline at end of file
@@ -1,34 +1,88 @@
-import boto3
-from typing import Dict, Any
+import asyncio
+from functools import lru_cache
+from typing import Dict, Any, List
 
-def write_to_dynamodb(table_name: str, item: Dict[str, Any]) -> Dict[str, Any]:
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(table_name)
+# Attribute names tried, in order, as the item's key
+_KEY_CANDIDATES = ('id', 'pk', 'primary_key')
+
+@lru_cache(maxsize=1)
+def _dynamodb_config():
+    # Imported on first use so importing this module doesn't pay for botocore
+    from botocore.config import Config
+    # Keep pooled connections alive so put/delete pairs reuse one TLS socket
+    return Config(tcp_keepalive=True, max_pool_connections=50, retries={'mode': 'adaptive'})
+
+@lru_cache(maxsize=None)
+def _get_table(table_name: str):
+    import boto3
+    from botocore.exceptions import BotoCoreError, ClientError
+    
+    table = boto3.resource('dynamodb', config=_dynamodb_config()).Table(table_name)
+    # Cheap call that resolves credentials and opens the TLS connection before the first write
+    try:
+        table.meta.client.describe_endpoints()
+    except (BotoCoreError, ClientError):
+        pass
+    return table
+
+@lru_cache(maxsize=1)
+def _get_client():
+    import boto3
+    return boto3.client('dynamodb', config=_dynamodb_config())
+
+def write_to_dynamodb(table_name: str, item: Dict[str, Any], cleanup: bool = False) -> Dict[str, Any]:
+    table = _get_table(table_name)
     some_variable = 3
     
     response = table.put_item(Item=item)
     
-    delete_item_from_dynamodb(table_name, item)
+    # Deleting right after the put is a second round trip, so only do it on request
+    if cleanup:
+        delete_item_from_dynamodb(table_name, item)
     
     return response
 
+def write_to_dynamodb_typed(table_name: str, typed_item: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    # Item is already in DynamoDB's typed form ({'pk': {'S': 'x'}}), so skip the resource-layer serializer
+    return _get_client().put_item(TableName=table_name, Item=typed_item)
+
 def delete_item_from_dynamodb(table_name, item):
-    dynamodb = boto3.resource('dynamodb')
-    table = dynamodb.Table(table_name)
+    table = _get_table(table_name)
     print("here could be your logging")
     
-    key = {}
-    for key_name in ['id', 'pk', 'primary_key']:
-        if key_name in item:
-            key[key_name] = item[key_name]
-            break
+    key_name = next((k for k in _KEY_CANDIDATES if k in item), None)
+    key = {key_name: item[key_name]} if key_name else {}
     
     response = table.delete_item(Key=key)
     return response
 
-def process_data(table_name, data_object):
-    result = write_to_dynamodb(table_name, data_object)
+def process_data(table_name, data_object, cleanup=False):
+    result = write_to_dynamodb(table_name, data_object, cleanup)
     return result
 
+def process_data_bulk(table_name: str, data_objects: List[Dict[str, Any]]) -> int:
+    # batch_writer sends BatchWriteItem requests of up to 25 items and resends unprocessed ones
+    with _get_table(table_name).batch_writer() as batch:
+        for data_object in data_objects:
+            batch.put_item(Item=data_object)
+    return len(data_objects)
+
+@lru_cache(maxsize=1)
+def _get_async_session():
+    import aioboto3
+    return aioboto3.Session()
+
+async def process_data_async(table_name: str, data_objects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    try:
+        session = _get_async_session()
+        from aiobotocore.config import AioConfig
+    except ImportError as e:
+        raise ImportError("process_data_async requires aioboto3: pip install aioboto3") from e
+    config = AioConfig(max_pool_connections=50, retries={'mode': 'adaptive'})
+    # All puts are in flight at once, bounded by the connection pool
+    async with session.resource('dynamodb', config=config) as dynamodb:
+        table = await dynamodb.Table(table_name)
+        return await asyncio.gather(*(table.put_item(Item=data_object) for data_object in data_objects))
+
 def printfive():
     return 5
@@ -4,25 +4,32 @@ Vocabulary Test Analyzer using Claude on AWS Bedrock
 Analyzes vocabulary test images and provides scoring with explanations
 """
 
-import base64
-import json
 import os
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 
-def encode_image(image_path: str) -> str:
+@lru_cache(maxsize=8)
+def _load_image_cached(image_path: str, mtime_ns: int, size: int) -> bytes:
+    """Read an image once per (path, mtime, size) so repeat calls reuse the bytes"""
+    with open(image_path, "rb") as image_file:
+        return image_file.read()
+
+
+def load_image(image_path: str) -> bytes:
     """
-    Encode an image to base64 string
+    Read the raw bytes of an image file, re-reading only when it has changed on disk
 
     Args:
         image_path: Path to the image file
 
     Returns:
-        Base64 encoded string of the image
+        The image file contents
     """
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+    st = os.stat(image_path)
+    return _load_image_cached(os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
 
 
 def analyze_vocab_test(image_paths: list[str], prompt: str) -> dict:
@@ -39,70 +46,70 @@ def analyze_vocab_test(image_paths: list[str], prompt: str) -> dict:
     print(f"Analyzing {len(image_paths)} image(s)...")
 
     try:
-        # Initialize AWS Bedrock client
-        bedrock = boto3.client(
-            service_name="bedrock-runtime",
-            region_name=os.environ.get("AWS_REGION", "eu-central-1")
-        )
-
-        # Prepare the content with images
-        content = []
-
-        # Add all images to the content
+        # Skip missing images
+        found_paths = []
         for image_path in image_paths:
             if not os.path.exists(image_path):
                 print(f"⚠️  Image not found: {image_path}")
                 continue
 
             print(f"Loading image: {image_path}")
-            image_base64 = encode_image(image_path)
-
-            content.append({
-                "type": "image",
-                "source": {
-                    "type": "base64",
-                    "media_type": "image/jpeg",
-                    "data": image_base64
+            found_paths.append(image_path)
+
+        # Read all images in parallel, overlapping the reads with client setup
+        with ThreadPoolExecutor(max_workers=max(len(found_paths), 1)) as executor:
+            image_data = executor.map(load_image, found_paths)
+
+            # Initialize AWS Bedrock client
+            bedrock = boto3.client(
+                service_name="bedrock-runtime",
+                region_name=os.environ.get("AWS_REGION", "eu-central-1")
+            )
+
+            # The Converse API takes raw image bytes, so no base64 step is needed
+            content = [
+                {
+                    "image": {
+                        "format": "jpeg",
+                        "source": {"bytes": image_bytes}
+                    }
                 }
-            })
+                for image_bytes in image_data
+            ]
 
         # Add the text prompt
-        content.append({
-            "type": "text",
-            "text": prompt
-        })
-
-        # Prepare the request body
-        request_body = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 4096,
-            "messages": [
+        content.append({"text": prompt})
+
+        print("Sending request to Claude on AWS Bedrock...")
+
+        # Call Claude via the AWS Bedrock Converse API
+        response = bedrock.converse(
+            modelId="eu.anthropic.claude-3-7-sonnet-20250219-v1:0",
+            messages=[
                 {
                     "role": "user",
                     "content": content
                 }
             ],
-            "temperature": 0.5
-        }
-
-        print("Sending request to Claude on AWS Bedrock...")
-
-        # Call Claude via AWS Bedrock
-        response = bedrock.invoke_model(
-            modelId="eu.anthropic.claude-3-7-sonnet-20250219-v1:0",
-            body=json.dumps(request_body)
+            inferenceConfig={
+                "maxTokens": 4096,
+                "temperature": 0.5
+            }
         )
 
         # Parse the response
-        response_body = json.loads(response["body"].read())
-        analysis = response_body["content"][0]["text"]
+        analysis = response["output"]["message"]["content"][0]["text"]
+        usage = response.get("usage", {})
 
         print("✓ Analysis completed")
 
         return {
             "success": True,
             "analysis": analysis,
-            "usage": response_body.get("usage", {})
+            "usage": {
+                "input_tokens": usage.get("inputTokens"),
+                "output_tokens": usage.get("outputTokens")
+            }
         }
 
     except Exception as e:
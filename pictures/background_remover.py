@@ -5,26 +5,41 @@ Simple background removal for professional photos
 """
 
 import base64
-import json
+import mmap
 import os
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from botocore.config import Config
+from bedrock_utils import HEDGE_AFTER_SECONDS, invoke_model_hedged, json_dumps, json_loads
+
+# Image file extensions picked up from reference_pics (matched case-insensitively)
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+# Images processed concurrently; each one is an independent, multi-second Bedrock call
+MAX_WORKERS = 8
 
 class BackgroundRemover:
-    def __init__(self, region_name: str = "us-east-1"):
-        """Initialize Bedrock client"""
+    def __init__(self, region_name: str = "us-east-1", hedge_after: float = HEDGE_AFTER_SECONDS):
+        """Initialize Bedrock client; pass hedge_after=None to disable duplicate requests"""
+        # Imported here so main() can bail out on an empty input folder without loading boto3
+        import boto3
+        from botocore.config import Config
+        
         self.client = boto3.client(
             "bedrock-runtime", 
             region_name=region_name,
-            config=Config(read_timeout=300)
+            config=Config(read_timeout=300, max_pool_connections=16, retries={'mode': 'adaptive'})
         )
         self.model_id = "amazon.nova-canvas-v1:0"
+        self.hedge_after = hedge_after
         
     def encode_image_to_base64(self, image_path: str) -> str:
         """Convert image file to base64 string"""
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            if os.fstat(image_file.fileno()).st_size == 0:
+                return ""
+            # Encode straight from the mapped file instead of reading it into a bytes copy first
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return base64.b64encode(mapped).decode('ascii')
     
     def remove_background(self, image_path: str, output_path: str):
         """Remove background from image"""
@@ -35,7 +50,7 @@ class BackgroundRemover:
         base64_image = self.encode_image_to_base64(image_path)
         
         # Create background removal request
-        body = json.dumps({
+        body = json_dumps({
             "taskType": "BACKGROUND_REMOVAL",
             "backgroundRemovalParams": {
                 "image": base64_image,
@@ -44,14 +59,7 @@ class BackgroundRemover:
         
         try:
             # Invoke the model
-            response = self.client.invoke_model(
-                body=body, 
-                modelId=self.model_id, 
-                accept="application/json", 
-                contentType="application/json"
-            )
-            
-            response_body = json.loads(response.get("body").read())
+            response_body = json_loads(invoke_model_hedged(self.client, self.model_id, body, self.hedge_after))
             
             # Check for errors
             if response_body.get("error"):
@@ -59,7 +67,7 @@ class BackgroundRemover:
             
             # Extract and save the image with background removed
             base64_image_data = response_body.get("images")[0]
-            image_bytes = base64.b64decode(base64_image_data.encode('ascii'))
+            image_bytes = base64.b64decode(base64_image_data)
             
             with open(output_path, "wb") as file:
                 file.write(image_bytes)
@@ -86,12 +94,11 @@ def main():
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
-    # Find JPG and PNG files
-    input_path = Path(reference_pics_dir)
-    image_files = (list(input_path.glob("*.JPG")) + 
-                  list(input_path.glob("*.jpg")) + 
-                  list(input_path.glob("*.PNG")) + 
-                  list(input_path.glob("*.png")))
+    # Find JPG and PNG files in a single directory pass
+    image_files = sorted(
+        Path(entry.path) for entry in os.scandir(reference_pics_dir)
+        if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+    )
     
     if not image_files:
         print("No JPG or PNG images found in reference_pics directory")
@@ -100,14 +107,13 @@ def main():
     # Initialize background remover
     remover = BackgroundRemover()
     
-    # Process each image
-    results = []
-    for i, image_file in enumerate(image_files, 1):
-        output_filename = f"no_background_{i:02d}.png"
-        output_path = os.path.join(output_dir, output_filename)
-        
-        result = remover.remove_background(str(image_file), output_path)
-        results.append(result)
+    # Process the images concurrently, keeping results in input order
+    jobs = [
+        (str(image_file), os.path.join(output_dir, f"no_background_{i:02d}.png"))
+        for i, image_file in enumerate(image_files, 1)
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(lambda job: remover.remove_background(*job), jobs))
     
     # Print summary
     print("\n📊 Processing Summary:")
@@ -5,28 +5,40 @@ Simple lighting fixes for professional business photos
 """
 
 import base64
-import json
+import mmap
 import os
 import random
-import boto3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from botocore.config import Config
 import logging
+from bedrock_utils import HEDGE_AFTER_SECONDS, invoke_model_hedged, json_dumps, json_loads
+
+# Images processed concurrently; each one is an independent, multi-second Bedrock call
+MAX_WORKERS = 8
 
 class BedrockPhotoEditor:
-    def __init__(self, region_name: str = "us-east-1"):
-        """Initialize Bedrock client"""
+    def __init__(self, region_name: str = "us-east-1", hedge_after: float = HEDGE_AFTER_SECONDS):
+        """Initialize Bedrock client; pass hedge_after=None to disable duplicate requests"""
+        # Imported here so main() can bail out on an empty input folder without loading boto3
+        import boto3
+        from botocore.config import Config
+        
         self.client = boto3.client(
             "bedrock-runtime", 
             region_name=region_name,
-            config=Config(read_timeout=300)
+            config=Config(read_timeout=300, max_pool_connections=16, retries={'mode': 'adaptive'})
         )
         self.model_id = "amazon.nova-canvas-v1:0"
+        self.hedge_after = hedge_after
         
     def encode_image_to_base64(self, image_path: str) -> str:
         """Convert image file to base64 string"""
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            if os.fstat(image_file.fileno()).st_size == 0:
+                return ""
+            # Encode straight from the mapped file instead of reading it into a bytes copy first
+            with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return base64.b64encode(mapped).decode('ascii')
     
     def process_image_inpainting(self, image_path: str, output_path: str):
         """Process single image using inpainting for professional lighting"""
@@ -39,11 +51,11 @@ class BedrockPhotoEditor:
         # Professional photo editing prompt
         edit_prompt = "You are a professional photo editor creating a professional headshot. Fix lighting for business photo quality with minimal face enhancement."
         
-        # Generate random seed
-        seed = random.randint(0, 858993460)
+        # Generate random seed (29 bits stays within Nova Canvas's 0-858993459 range)
+        seed = random.getrandbits(29)
         
         # Create inpainting request
-        body = json.dumps({
+        body = json_dumps({
             "taskType": "INPAINTING",
             "inPaintingParams": {
                 "text": edit_prompt,
@@ -62,14 +74,7 @@ class BedrockPhotoEditor:
         
         try:
             # Invoke the model
-            response = self.client.invoke_model(
-                body=body, 
-                modelId=self.model_id, 
-                accept="application/json", 
-                contentType="application/json"
-            )
-            
-            response_body = json.loads(response.get("body").read())
+            response_body = json_loads(invoke_model_hedged(self.client, self.model_id, body, self.hedge_after))
             
             # Check for errors
             if response_body.get("error"):
@@ -77,7 +82,7 @@ class BedrockPhotoEditor:
             
             # Extract and save the enhanced image
             base64_image_data = response_body.get("images")[0]
-            image_bytes = base64.b64decode(base64_image_data.encode('ascii'))
+            image_bytes = base64.b64decode(base64_image_data)
             
             with open(output_path, "wb") as file:
                 file.write(image_bytes)
@@ -115,14 +120,13 @@ def main():
     # Initialize editor
     editor = BedrockPhotoEditor()
     
-    # Process each image
-    results = []
-    for i, image_file in enumerate(image_files, 1):
-        output_filename = f"enhanced_professional_{i:02d}.png"
-        output_path = os.path.join(output_dir, output_filename)
-        
-        result = editor.process_image_inpainting(str(image_file), output_path)
-        results.append(result)
+    # Process the images concurrently, keeping results in input order
+    jobs = [
+        (str(image_file), os.path.join(output_dir, f"enhanced_professional_{i:02d}.png"))
+        for i, image_file in enumerate(image_files, 1)
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = list(executor.map(lambda job: editor.process_image_inpainting(*job), jobs))
     
     # Print summary
     print("\n📊 Processing Summary:")
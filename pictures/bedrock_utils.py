@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the Amazon Bedrock Nova Canvas scripts
+"""
+
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Prefer orjson for the large JSON bodies (base64 images), fall back to stdlib json
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(data) -> bytes:
+        return json.dumps(data).encode('utf-8')
+    json_loads = json.loads
+
+# Send one duplicate request when a call takes longer than this (seconds)
+HEDGE_AFTER_SECONDS = 60
+
+def invoke_model(client, model_id: str, body: bytes, stream: bool = False):
+    """Invoke the model and read the full response body, or return the body stream"""
+    response = client.invoke_model(
+        body=body,
+        modelId=model_id,
+        accept="application/json",
+        contentType="application/json"
+    )
+    return response.get("body") if stream else response.get("body").read()
+
+def _close_stream(future):
+    """Done-callback that closes the StreamingBody of a request whose result is not used"""
+    if future.cancelled() or future.exception() is not None:
+        return
+    future.result().close()
+
+def invoke_model_hedged(client, model_id: str, body: bytes, hedge_after: float = HEDGE_AFTER_SECONDS,
+                        stream: bool = False):
+    """Invoke the model, racing one duplicate request if the first is slower than hedge_after"""
+    if hedge_after is None:
+        return invoke_model(client, model_id, body, stream)
+    executor = ThreadPoolExecutor(max_workers=2)
+    try:
+        futures = [executor.submit(invoke_model, client, model_id, body, stream)]
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            # Straggler: send at most one duplicate and take whichever finishes first
+            futures.append(executor.submit(invoke_model, client, model_id, body, stream))
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        winner = next(iter(done))
+        if stream:
+            # The loser's open stream would otherwise hold a pooled connection until garbage collection
+            for future in futures:
+                if future is not winner:
+                    future.add_done_callback(_close_stream)
+        return winner.result()
+    finally:
+        # A request already in flight can't be aborted; stop waiting for the loser
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -5,27 +5,60 @@ Generate images from text prompts
 """
 
 import base64
-import json
+import hashlib
 import os
 import random
 import boto3
+from functools import lru_cache
 from pathlib import Path
 from botocore.config import Config
+from bedrock_utils import HEDGE_AFTER_SECONDS, invoke_model_hedged, json_dumps, json_loads
+
+# Optional: stream multi-image responses instead of parsing the whole body at once
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Nova Canvas returns at most this many images per request
+MAX_IMAGES_PER_REQUEST = 5
+
+@lru_cache(maxsize=8)
+def _sha256_hex(body: bytes) -> str:
+    """SHA-256 of a request body, computed once per distinct body"""
+    return hashlib.sha256(body).hexdigest()
+
+def _stream_images(stream):
+    """Yield base64 images from a streamed response body, raising on a model error field"""
+    for prefix, event, value in ijson.parse(stream):
+        if prefix == "images.item" and event == "string":
+            yield value
+        elif prefix == "error" and value:
+            raise Exception(f"Model error: {value}")
 
 class BedrockImageGenerator:
-    def __init__(self, region_name: str = "us-east-1"):
-        """Initialize Bedrock client"""
+    def __init__(self, region_name: str = "us-east-1", hedge_after: float = HEDGE_AFTER_SECONDS):
+        """Initialize Bedrock client; pass hedge_after=None to disable duplicate requests"""
         self.client = boto3.client(
             "bedrock-runtime",
             region_name=region_name,
             config=Config(read_timeout=300)
         )
         self.model_id = "amazon.nova-canvas-v1:0"
+        self.hedge_after = hedge_after
+        self.client.meta.events.register(
+            "before-sign.bedrock-runtime.InvokeModel", self._add_cached_body_hash
+        )
+
+    def _add_cached_body_hash(self, request, **kwargs):
+        """Hand SigV4 a memoized payload hash so retries and hedged duplicates skip re-hashing"""
+        if isinstance(request.body, bytes) and "X-Amz-Content-SHA256" not in request.headers:
+            request.headers["X-Amz-Content-SHA256"] = _sha256_hex(request.body)
 
     def generate_image(self, prompt: str, output_path: str,
                       negative_prompt: str = "bad quality, low res, blurry",
                       width: int = 1024, height: int = 1024,
-                      cfg_scale: float = 7.0):
+                      cfg_scale: float = 7.0, num_images: int = 1):
         """
         Generate an image from a text prompt
 
@@ -36,22 +69,23 @@ class BedrockImageGenerator:
             width: Image width (default 1024)
             height: Image height (default 1024)
             cfg_scale: How closely to follow the prompt (default 7.0)
+            num_images: Variants to generate in one request (1-5); extra images get a _02, _03... suffix
         """
 
         print(f"Generating image from prompt: '{prompt[:60]}...'")
 
-        # Generate random seed for reproducibility
-        seed = random.randint(0, 858993460)
+        # Generate random seed for reproducibility (29 bits stays within Nova Canvas's 0-858993459 range)
+        seed = random.getrandbits(29)
 
         # Create text-to-image request
-        body = json.dumps({
+        body = json_dumps({
             "taskType": "TEXT_IMAGE",
             "textToImageParams": {
                 "text": prompt,
                 "negativeText": negative_prompt
             },
             "imageGenerationConfig": {
-                "numberOfImages": 1,
+                "numberOfImages": min(num_images, MAX_IMAGES_PER_REQUEST),
                 "height": height,
                 "width": width,
                 "cfgScale": cfg_scale,
@@ -61,29 +95,35 @@ class BedrockImageGenerator:
 
         try:
             # Invoke the model
-            response = self.client.invoke_model(
-                body=body,
-                modelId=self.model_id,
-                accept="application/json",
-                contentType="application/json"
-            )
+            if ijson is not None and num_images > 1:
+                # Pull the base64 images out of the body one at a time
+                images = _stream_images(invoke_model_hedged(self.client, self.model_id, body, self.hedge_after, stream=True))
+            else:
+                response_body = json_loads(invoke_model_hedged(self.client, self.model_id, body, self.hedge_after))
+
+                # Check for errors
+                if response_body.get("error"):
+                    raise Exception(f"Model error: {response_body.get('error')}")
+                images = response_body.get("images")
 
-            response_body = json.loads(response.get("body").read())
+            # Extract and save the generated images; the first keeps output_path as given
+            stem, ext = os.path.splitext(output_path)
+            output_paths = []
+            for i, base64_image_data in enumerate(images, 1):
+                image_path = output_path if i == 1 else f"{stem}_{i:02d}{ext}"
+                image_bytes = base64.b64decode(base64_image_data)
 
-            # Check for errors
-            if response_body.get("error"):
-                raise Exception(f"Model error: {response_body.get('error')}")
+                with open(image_path, "wb") as file:
+                    file.write(image_bytes)
 
-            # Extract and save the generated image
-            base64_image_data = response_body.get("images")[0]
-            image_bytes = base64.b64decode(base64_image_data.encode('ascii'))
+                print(f"✓ Image saved: {image_path}")
+                output_paths.append(image_path)
 
-            with open(output_path, "wb") as file:
-                file.write(image_bytes)
+            if not output_paths:
+                raise Exception("Model returned no images")
 
-            print(f"✓ Image saved: {output_path}")
             print(f"  Seed: {seed} (use this to reproduce the same image)")
-            return {"success": True, "output_path": output_path, "seed": seed}
+            return {"success": True, "output_path": output_path, "output_paths": output_paths, "seed": seed}
 
         except Exception as e:
             print(f"✗ Error generating image: {str(e)}")
@@ -4,13 +4,125 @@ Image Generator using OpenAI
 Generate images from text prompts
 """
 
-import base64
+import asyncio
+import hashlib
+import mmap
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from openai import OpenAI
+from functools import lru_cache
+from openai import AsyncOpenAI, OpenAI
+
+# pybase64 decodes with SIMD (SSSE3/AVX2) and is several times faster on large images
+try:
+    from pybase64 import b64decode as _b64decode
+except ImportError:
+    from base64 import b64decode as _b64decode
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "generated_images")
+
+# Generated images keyed by a hash of everything that determines the output
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".img_cache")
+
+# Upper bound on image generation requests in flight at once
+MAX_CONCURRENT_REQUESTS = 10
+
+# Async callers decode and write images here so the event loop keeps serving other requests
+_IO_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Base64 characters decoded per write; a multiple of 4 so every chunk decodes on its own
+DECODE_CHUNK_CHARS = 87380
+
+@lru_cache(maxsize=1)
+def _client() -> OpenAI:
+    """Shared OpenAI client (uses OPENAI_API_KEY env variable), so connections are reused across calls"""
+    return OpenAI(timeout=300.0, max_retries=3)
+
+@lru_cache(maxsize=32)
+def _ref_hash(path: str, mtime_ns: int, size: int) -> str:
+    """MD5 of a reference image, computed once per (path, mtime, size) from a memory map"""
+    if size == 0:
+        return hashlib.md5().hexdigest()
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return hashlib.md5(mapped).hexdigest()
+
+def _prepare_request(prompt: str, reference_image_path: str, size: str, quality: str):
+    """Build the final prompt and the cache path for a generation request"""
+    print(f"Generating image from prompt: '{prompt[:60]}...'")
+    print(f"Size: {size}, Quality: {quality}")
+
+    if reference_image_path:
+        print(f"Using reference image: {reference_image_path}")
+
+    # Prepare the prompt - add style reference instruction if reference image provided
+    enhanced_prompt = prompt
+    ref_hash = ""
+    if reference_image_path and os.path.exists(reference_image_path):
+        enhanced_prompt = f"Using the exact same art style, color palette, line work, and aesthetic as the reference, create: {prompt}"
+        st = os.stat(reference_image_path)
+        ref_hash = _ref_hash(os.path.abspath(reference_image_path), st.st_mtime_ns, st.st_size)
+
+    key = hashlib.sha256(f"{enhanced_prompt}|{size}|{quality}|{ref_hash}".encode()).hexdigest()
+    return enhanced_prompt, os.path.join(CACHE_DIR, key + ".png")
+
+def _copy_from_cache(cache_path: str, output_path: str):
+    """Return a previously generated image for the same request, or None on a cache miss"""
+    try:
+        shutil.copyfile(cache_path, output_path)
+    except FileNotFoundError:
+        return None
+    print(f"✓ Image saved from cache: {output_path}")
+    return {"success": True, "output_path": output_path, "cached": True}
+
+def _store_in_cache(output_path: str, cache_path: str):
+    """Copy a generated image into the cache via a temp file, so an interrupted copy is never a hit"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(output_path, tmp)
+        os.replace(tmp, cache_path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def _request_kwargs(enhanced_prompt: str, size: str, quality: str) -> dict:
+    """Arguments for the responses API image generation call"""
+    return {
+        "model": "gpt-4o",
+        "input": enhanced_prompt,
+        "tools": [{
+            "type": "image_generation",
+            "size": size,
+            "quality": quality
+        }],
+    }
+
+def _decode_and_write(image_base64: str, output_path: str, cache_path: str) -> str:
+    """Decode the image to output_path and copy it into the cache"""
+    # Decode window by window so the full decoded image is never held in memory
+    with open(output_path, "wb") as f:
+        for start in range(0, len(image_base64), DECODE_CHUNK_CHARS):
+            f.write(_b64decode(image_base64[start:start + DECODE_CHUNK_CHARS], validate=False))
+
+    _store_in_cache(output_path, cache_path)
+
+    print(f"✓ Image saved: {output_path}")
+    return output_path
+
+def _image_data(response):
+    """Base64 image from a responses API result, or None if it contains no image"""
+    for output in response.output:
+        if output.type == "image_generation_call":
+            return output.result
+    print("✗ No image data received from API")
+    return None
 
 def generate_image(prompt: str, output_path: str, reference_image_path: str = None,
-                   size: str = "1024x1024", quality: str = "high"):
+                   size: str = "1024x1024", quality: str = "high", use_cache: bool = True):
     """
     Generate an image from a text prompt using OpenAI
 
@@ -20,77 +132,96 @@ def generate_image(prompt: str, output_path: str, reference_image_path: str = No
         reference_image_path: Optional path to reference image for style consistency
         size: Image dimensions (e.g., "1024x1024", "1024x1536", "1536x1024")
         quality: Rendering quality ("low", "medium", "high", or "auto")
+        use_cache: Reuse a cached image for an identical request; pass False for a new variation
     """
-    print(f"Generating image from prompt: '{prompt[:60]}...'")
-    print(f"Size: {size}, Quality: {quality}")
+    try:
+        enhanced_prompt, cache_path = _prepare_request(prompt, reference_image_path, size, quality)
+        cached = use_cache and _copy_from_cache(cache_path, output_path)
+        if cached:
+            return cached
 
-    if reference_image_path:
-        print(f"Using reference image: {reference_image_path}")
+        # Generate image using the responses API with configuration
+        response = _client().responses.create(**_request_kwargs(enhanced_prompt, size, quality))
+        image_data = _image_data(response)
+        if image_data is None:
+            return {"success": False, "error": "No image data in response"}
 
-    try:
-        # Initialize OpenAI client (uses OPENAI_API_KEY env variable)
-        client = OpenAI()
+        _decode_and_write(image_data, output_path, cache_path)
+        return {"success": True, "output_path": output_path}
 
-        # Prepare the prompt - add style reference instruction if reference image provided
-        enhanced_prompt = prompt
-        if reference_image_path and os.path.exists(reference_image_path):
-            enhanced_prompt = f"Using the exact same art style, color palette, line work, and aesthetic as the reference, create: {prompt}"
+    except Exception as e:
+        print(f"✗ Error generating image: {str(e)}")
+        return {"success": False, "error": str(e)}
 
-        # Generate image using the responses API with configuration
-        response = client.responses.create(
-            model="gpt-4o",
-            input=enhanced_prompt,
-            tools=[{
-                "type": "image_generation",
-                "size": size,
-                "quality": quality
-            }],
-        )
-
-        # Extract the image data
-        image_data = [
-            output.result
-            for output in response.output
-            if output.type == "image_generation_call"
-        ]
-
-        if image_data:
-            # Save the image
-            image_base64 = image_data[0]
-            with open(output_path, "wb") as f:
-                f.write(base64.b64decode(image_base64))
-
-            print(f"✓ Image saved: {output_path}")
-            return {"success": True, "output_path": output_path}
-        else:
-            print("✗ No image data received from API")
+async def agenerate_image(client: AsyncOpenAI, prompt: str, output_path: str, reference_image_path: str = None,
+                          size: str = "1024x1024", quality: str = "high", use_cache: bool = True):
+    """Async variant of generate_image that awaits the API call on a shared AsyncOpenAI client"""
+    try:
+        enhanced_prompt, cache_path = _prepare_request(prompt, reference_image_path, size, quality)
+        cached = use_cache and _copy_from_cache(cache_path, output_path)
+        if cached:
+            return cached
+
+        response = await client.responses.create(**_request_kwargs(enhanced_prompt, size, quality))
+        image_data = _image_data(response)
+        if image_data is None:
             return {"success": False, "error": "No image data in response"}
 
+        # Decode and write off the event loop; success is reported once the file is on disk
+        await asyncio.get_running_loop().run_in_executor(
+            _IO_POOL, _decode_and_write, image_data, output_path, cache_path)
+        return {"success": True, "output_path": output_path}
+
     except Exception as e:
         print(f"✗ Error generating image: {str(e)}")
         return {"success": False, "error": str(e)}
 
+async def generate_images_batch(prompts: list[str], output_dir: str, **kwargs) -> list[dict]:
+    """
+    Generate one image per prompt concurrently
+
+    Args:
+        prompts: Text descriptions of the images to generate
+        output_dir: Directory the images are saved to, numbered in prompt order
+        **kwargs: Passed on to agenerate_image (reference_image_path, size, quality, use_cache)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    # The SDK retries connection errors, 429s and 5xx with exponential backoff
+    client = AsyncOpenAI(max_retries=3)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    async def generate_one(i: int, prompt: str) -> dict:
+        output_path = os.path.join(output_dir, f"openai_generated_{timestamp}_{i:02d}.png")
+        async with semaphore:
+            return await agenerate_image(client, prompt, output_path, **kwargs)
+
+    async with client:
+        return await asyncio.gather(*(generate_one(i, prompt) for i, prompt in enumerate(prompts, 1)))
+
 def main():
-    """Main function to generate an image"""
+    """Main function to generate images"""
 
     # ============================================================
-    # ADJUST YOUR PROMPT HERE:
+    # ADJUST YOUR PROMPTS HERE (one image per prompt, generated concurrently):
     # ============================================================
-    prompt = "In the style of a business friendly cartoon, with little facial features and minimalistic design, that is neither too colourful nor too boring: Show a man falling asleep on a typewriter, with headphones on and a huge stack of paperwork next to him on the desk. He is alone in kind of a therapist room with lots of wood and some plants. He is also bald. The lighting is warm and inviting, with soft shadows and a cozy atmosphere."
+    prompts = [
+        "In the style of a business friendly cartoon, with little facial features and minimalistic design, that is neither too colourful nor too boring: Show a man falling asleep on a typewriter, with headphones on and a huge stack of paperwork next to him on the desk. He is alone in kind of a therapist room with lots of wood and some plants. He is also bald. The lighting is warm and inviting, with soft shadows and a cozy atmosphere.",
+    ]
 
     # Optional: Set a reference image to match the style
     # Example: "generated_images/openai_generated_20251011_153436.png"
     reference_image = "generated_images/openai_generated_20251011_153436.png"
-    # ============================================================
 
-    # Set up paths
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_dir = os.path.join(script_dir, "generated_images")
+    # Set to False to generate a new variation instead of reusing the cached image for the same prompt
+    use_cache = True
+    # ============================================================
 
     # Handle reference image path
     reference_path = None
     if reference_image:
-        reference_path = os.path.join(script_dir, reference_image)
+        reference_path = os.path.join(SCRIPT_DIR, reference_image)
         if not os.path.exists(reference_path):
             print(f"⚠️  Reference image not found: {reference_path}")
             print("Proceeding without reference image...")
@@ -99,25 +230,19 @@ def main():
     print("🎨 OpenAI Image Generator")
     print("=" * 60)
 
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Generate output filename with timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_filename = f"openai_generated_{timestamp}.png"
-    output_path = os.path.join(output_dir, output_filename)
-
-    # Generate image
-    result = generate_image(
-        prompt=prompt,
-        output_path=output_path,
-        reference_image_path=reference_path
-    )
-
-    if result.get("success"):
-        print(f"\n🎉 Success! Image saved to: {output_path}")
-    else:
-        print(f"\n❌ Failed to generate image: {result.get('error')}")
+    # Generate images; filenames get a timestamp and the prompt's position
+    results = asyncio.run(generate_images_batch(
+        prompts,
+        OUTPUT_DIR,
+        reference_image_path=reference_path,
+        use_cache=use_cache
+    ))
+
+    for result in results:
+        if result.get("success"):
+            print(f"\n🎉 Success! Image saved to: {result['output_path']}")
+        else:
+            print(f"\n❌ Failed to generate image: {result.get('error')}")
 
 if __name__ == "__main__":
     main()
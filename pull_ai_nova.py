@@ -3,10 +3,31 @@ import subprocess
 import os
 import sys
 import argparse
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
+
+def _atomic_write(path, data):
+    """Write bytes to a temp file next to path and rename it into place"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+    try:
+        try:
+            # mkstemp creates the file owner-only; give it the mode a plain open() would
+            umask = os.umask(0)
+            os.umask(umask)
+            os.fchmod(fd, 0o666 & ~umask)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
 #TODO make MultiEdit Tool available
 def pull_ai_nova():
     """Pull latest changes from main branch and prepare documentation branch if needed"""
@@ -26,41 +47,40 @@ def pull_ai_nova():
             print(f"Error: {repo_path} is not a git repository")
             sys.exit(1)
         
-        # Get current HEAD to compare changes
-        current_head = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
-        current_head = current_head.stdout.strip()
-        
         # Fetch latest changes
         print("Fetching latest changes...")
-        subprocess.run(['git', 'fetch', 'origin'], check=True)
+        # --quiet turns off the progress meter; stderr is kept for the error message
+        subprocess.run(['git', '-c', 'protocol.version=2', 'fetch', '--quiet', 'origin'],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         
         # Switch to main branch
         print("Switching to main branch...")
-        subprocess.run(['git', 'checkout', 'main'], check=True)
+        subprocess.run(['git', '-c', 'advice.detachedHead=false', 'checkout', '--quiet', 'main'],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         
         # Pull latest changes
         print("Pulling latest changes from main...")
-        result = subprocess.run(['git', 'pull', 'origin', 'main'], check=True)
-        
-        # Get new HEAD after pull
-        new_head = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
-        new_head = new_head.stdout.strip()
-        
-        # Track changed files and create documentation branch if there were updates
-        changed_files = []
+        subprocess.run(['git', '-c', 'protocol.version=2', 'pull', '--quiet', 'origin', 'main'],
+                       check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        
+        # Git points ORIG_HEAD at the pre-pull commit, so an empty diff means no changes
+        # -z keeps names unquoted and NUL-separated, so the raw bytes can be split directly
+        git_diff = subprocess.run(['git', 'diff', '-z', '--name-only', 'ORIG_HEAD', 'HEAD'], 
+                                capture_output=True, check=True)
+        # Convert relative paths to absolute paths
+        cwd = os.getcwd()
+        changed_files = [os.path.normpath(os.path.join(cwd, os.fsdecode(f))) for f in git_diff.stdout.split(b'\x00')[:-1]]
+        
+        # Create documentation branch if there were updates
         doc_branch_info = None
         
-        if current_head != new_head:
+        if changed_files:
             print("Changes detected, tracking modified files...")
-            # Get list of changed files between old and new HEAD
-            git_diff = subprocess.run(['git', 'diff', '--name-only', current_head, new_head], 
-                                    capture_output=True, text=True, check=True)
-            # Convert relative paths to absolute paths
-            changed_files = [os.path.abspath(f.strip()) for f in git_diff.stdout.splitlines() if f.strip()]
+            new_head = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+            new_head = new_head.stdout.strip()
             
             print(f"Found {len(changed_files)} changed files:")
-            for file in changed_files:
-                print(f"  - {file}")
+            sys.stdout.write("".join(map("  - {}\n".format, changed_files)))
             
             # Create documentation branch
             commit_short = new_head[:8]
@@ -70,8 +90,7 @@ def pull_ai_nova():
             subprocess.run(['git', 'checkout', '-b', doc_branch], check=True)
             
             # Save changed files list (absolute paths)
-            with open('.claude_changed_files.txt', 'w') as f:
-                f.write('\n'.join(changed_files))
+            _atomic_write('.claude_changed_files.txt', os.fsencode('\n'.join(changed_files)))
             
             doc_branch_info = {
                 'branch_name': doc_branch,
@@ -89,6 +108,8 @@ def pull_ai_nova():
         
     except subprocess.CalledProcessError as e:
         print(f"Git command failed: {e}")
+        if e.stderr:
+            print(e.stderr.strip())
         sys.exit(1)
     except Exception as e:
         print(f"Unexpected error: {e}")
@@ -110,14 +131,11 @@ def commit_documentation_changes(doc_branch_info, changed_files):
     try:
         print("\n📝 Committing documentation changes...")
         
-        # Check if there are any changes to commit
-        result = subprocess.run(['git', 'diff', '--cached'], capture_output=True, text=True)
-        staged_changes = result.stdout.strip()
-        
-        result = subprocess.run(['git', 'diff'], capture_output=True, text=True)
-        unstaged_changes = result.stdout.strip()
+        # Check if there are any changes to commit (--quiet exits nonzero when there are)
+        has_staged = subprocess.run(['git', 'diff', '--cached', '--quiet']).returncode != 0
+        has_unstaged = subprocess.run(['git', 'diff', '--quiet']).returncode != 0
         
-        if not staged_changes and not unstaged_changes:
+        if not (has_staged or has_unstaged):
             print("No documentation changes to commit.")
             return
         
@@ -128,7 +146,7 @@ def commit_documentation_changes(doc_branch_info, changed_files):
         commit_message = f"""Improve documentation for {doc_branch_info['changed_files_count']} changed files
 
 Documentation improvements for commit {doc_branch_info['commit_short']}:
-{chr(10).join([f'- {file}' for file in changed_files])}
+{chr(10).join(map('- {}'.format, changed_files))}
 
 Changes include:
 - Added missing docstrings following standard conventions
@@ -176,7 +194,7 @@ def create_documentation_pr(doc_branch_info, changed_files):
 This PR adds comprehensive documentation for {doc_branch_info['changed_files_count']} files that were changed in commit `{doc_branch_info['commit_short']}`.
 
 ### 📁 Files Updated:
-{chr(10).join([f'- `{file}`' for file in changed_files])}
+{chr(10).join(map('- `{}`'.format, changed_files))}
 
 ### ✨ Improvements Made:
 - ✅ **Added missing docstrings** following Python/JavaScript/TypeScript conventions
@@ -226,16 +244,12 @@ This PR was automatically generated by the Claude Code SDK Documentation Agent,
 def run_claude_sdk_workflow(changed_files=None, doc_branch_info=None):
     """Run Claude Code SDK documentation agent"""
     try:
-        import subprocess
-        import sys
-        
         # Build command for CLI integration
         cmd = [sys.executable, "-m", "claude_code_tools.cli_integration"]
         
         if changed_files:
             # Write changed files for the agent to process
-            with open('.claude_changed_files.txt', 'w') as f:
-                f.write('\n'.join(changed_files))
+            _atomic_write('.claude_changed_files.txt', os.fsencode('\n'.join(changed_files)))
             cmd.append("--changed-files")
             print(f"\n🤖 Starting Claude Code SDK agent for {len(changed_files)} changed files...")
         else:
@@ -291,7 +305,7 @@ def run_legacy_claude_workflow(prompt_file="prompt.txt", changed_files=None, doc
         
         # Format prompt with changed files
         if changed_files:
-            changed_files_text = "\n".join([f"- {file}" for file in changed_files])
+            changed_files_text = "\n".join(map("- {}".format, changed_files))
             prompt = prompt_template.format(changed_files=changed_files_text)
             print(f"\nStarting legacy Claude workflow for {len(changed_files)} changed files...")
         else:
@@ -300,11 +314,9 @@ def run_legacy_claude_workflow(prompt_file="prompt.txt", changed_files=None, doc
         
         print("=" * 50)
         
-        # Initialize Claude client
-        client = ClaudeClient()
-        
-        # Run the conversation
-        result = client.chat_with_tools(prompt)
+        # Initialize Claude client and run the conversation
+        with ClaudeClient() as client:
+            result = client.chat_with_tools(prompt)
         
         print("=" * 50)
         print("Legacy Claude documentation workflow completed!")
@@ -348,8 +360,6 @@ def main():
     if args.interactive:
         # Interactive mode with Claude Code SDK
         try:
-            import subprocess
-            import sys
             cmd = [sys.executable, "-m", "claude_code_tools.cli_integration", "--interactive"]
             subprocess.run(cmd, cwd=".", check=True)
         except Exception as e:
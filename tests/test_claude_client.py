@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import tempfile
+import unittest
+
+from claude_tools.claude_client import ClaudeClient
+
+
+class RecordingClient(ClaudeClient):
+    """ClaudeClient whose tool execution records how many calls overlap per file"""
+
+    def __init__(self):
+        super().__init__(api_key="test-key")
+        self.active = {}
+        self.max_active = {}
+
+    async def _execute_tool(self, content):
+        path = os.path.realpath(content["input"]["path"])
+        self.active[path] = self.active.get(path, 0) + 1
+        self.max_active[path] = max(self.max_active.get(path, 0), self.active[path])
+        await asyncio.sleep(0.01)
+        self.active[path] -= 1
+        return await super()._execute_tool(content)
+
+
+class ExecuteToolsTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_same_file_with_different_spellings_runs_in_order(self):
+        with open("a.py", "w", encoding="utf-8") as f:
+            f.write("one\ntwo\nthree\n")
+
+        spellings = ["a.py", "./a.py", os.path.abspath("a.py")]
+        tool_uses = [{
+            "id": f"tool_{i}",
+            "name": "str_replace_based_edit_tool",
+            "input": {"command": "str_replace", "path": path, "old_str": old, "new_str": old.upper()}
+        } for i, (path, old) in enumerate(zip(spellings, ["one", "two", "three"]))]
+
+        with RecordingClient() as client:
+            results = asyncio.run(client._execute_tools(tool_uses))
+
+        self.assertTrue(all("content" in result for result in results), results)
+        self.assertEqual(client.max_active[os.path.realpath("a.py")], 1)
+        with open("a.py", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "ONE\nTWO\nTHREE\n")
+
+    def test_sync_chat_inside_running_loop_points_to_async_variant(self):
+        async def call_sync():
+            with ClaudeClient(api_key="test-key") as client:
+                client.chat_with_tools("hello")
+
+        with self.assertRaisesRegex(RuntimeError, "achat_with_tools"):
+            asyncio.run(call_sync())
+
+
+if __name__ == "__main__":
+    unittest.main()
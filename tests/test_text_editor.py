@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+import os
+import tempfile
+import unittest
+
+from claude_tools.text_editor import TextEditor
+
+
+class BackupTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        os.chdir(self._tmp.name)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_same_basename_in_different_directories_keeps_separate_backups(self):
+        for directory in ("a", "b"):
+            os.makedirs(directory)
+            with open(os.path.join(directory, "x.py"), "w", encoding="utf-8") as f:
+                f.write(f"{directory} original\n")
+
+        editor = TextEditor()
+        backup_a = editor._create_backup(os.path.join("a", "x.py"))
+        backup_b = editor._create_backup(os.path.join("b", "x.py"))
+
+        self.assertNotEqual(backup_a, backup_b)
+        with open(backup_a, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "a original\n")
+        with open(backup_b, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "b original\n")
+
+
+if __name__ == "__main__":
+    unittest.main()